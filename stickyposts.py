@@ -2,19 +2,20 @@ import sys
 import os
 import json
 import base64
-from cryptography.fernet import Fernet
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+import hashlib
+import functools
+import time
 from PyQt6.QtWidgets import (
-    QApplication, QWidget, QTextEdit, QPushButton, QHBoxLayout, QVBoxLayout, QSystemTrayIcon, QMenu, QCheckBox, QLabel, QDialog, QLineEdit, QMessageBox, QInputDialog, QComboBox, QTabWidget
+    QApplication, QWidget, QPlainTextEdit, QPushButton, QHBoxLayout, QVBoxLayout, QSystemTrayIcon, QMenu, QCheckBox, QLabel, QDialog, QLineEdit, QMessageBox, QInputDialog, QComboBox, QTabWidget, QProgressDialog,
+    QColorDialog, QSpinBox, QFontComboBox
 )
-from PyQt6.QtGui import QIcon, QCursor, QMouseEvent, QKeySequence, QAction
-from PyQt6.QtCore import Qt, QRect, QPoint, QSize
-import win32com.client  # For startup shortcut
-import win32cred  # For Windows Credential Manager
-from pynput import keyboard  # For global hotkey
+from PyQt6.QtGui import QIcon, QCursor, QMouseEvent, QKeySequence, QAction, QTextCursor, QPixmap, QPainter, QColor
+from PyQt6.QtCore import Qt, QRect, QPoint, QSize, QSaveFile, QIODevice, QRunnable, QThreadPool, QTimer, QObject, QEventLoop, pyqtSignal
 import threading
 
+# Heavy modules (cryptography, pywin32) are imported inside the
+# functions that use them so a plain startup doesn't pay for loading them.
+
 # Constants
 NOTE_BG_COLOR = '#FFFFE0'
 NOTE_TEXT_COLOR = '#000000'  # Default text color
@@ -32,89 +33,153 @@ MAX_NOTES_TO_SAVE = 50  # Limit number of notes to prevent excessive storage
 MAX_NOTE_TEXT_LENGTH = 10000  # Limit individual note text length
 CLEANUP_INTERVAL = 300000  # 5 minutes - cleanup interval
 
+# JSON helpers: use orjson when it is installed, it is several times faster than
+# the standard library on both encode and decode
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def json_dumps(data):
+    """Serialize data to compact JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(',', ':')).encode()
+
+def json_loads(raw):
+    """Parse JSON from bytes"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
 # Encryption utilities
-def derive_key_from_password(password, salt=None):
-    """Derive encryption key from password using PBKDF2"""
+KDF_SCRYPT = 'scrypt-v1'  # Tag stored in encrypted files; files without a tag use PBKDF2
+KDF_PBKDF2 = 'pbkdf2-sha256'
+# Derived keys keyed by (password digest, salt, kdf); the KDF is deliberately slow and
+# auto-save would otherwise re-run it on every save
+_KEY_CACHE = {}
+# Fernet instances keyed by derived key, so saves don't rebuild one each time
+_FERNET_CACHE = {}
+_FERNET_CACHE_SIZE = 4
+# Salt of the encrypted notes file; reused across saves so the key cache hits.
+# Fernet adds a fresh IV to every token, so reusing the salt is safe.
+_notes_salt = None
+
+def derive_key_from_password(password, salt=None, kdf=KDF_SCRYPT):
+    """Derive encryption key from password using scrypt (or PBKDF2 for legacy files)"""
     if salt is None:
         salt = os.urandom(16)
-    kdf = PBKDF2HMAC(
-        algorithm=hashes.SHA256(),
-        length=32,
-        salt=salt,
-        iterations=100000,
-    )
-    key = base64.urlsafe_b64encode(kdf.derive(password.encode()))
+    cache_key = (hashlib.sha256(password.encode()).digest(), salt, kdf)
+    key = _KEY_CACHE.get(cache_key)
+    if key is None:
+        # hashlib calls straight into OpenSSL; same parameters and output as before
+        if kdf == KDF_SCRYPT:
+            raw = hashlib.scrypt(password.encode(), salt=salt, n=2**14, r=8, p=1, dklen=32)
+        else:
+            raw = hashlib.pbkdf2_hmac('sha256', password.encode(), salt, 100000, dklen=32)
+        key = base64.urlsafe_b64encode(raw)
+        _KEY_CACHE[cache_key] = key
     return key, salt
 
-def encrypt_data(data, password):
-    """Encrypt data with password"""
-    key, salt = derive_key_from_password(password)
-    fernet = Fernet(key)
-    encrypted_data = fernet.encrypt(json.dumps(data).encode())
+def clear_key_cache():
+    """Forget all cached derived keys and rotate the notes salt (call when the password changes)"""
+    global _notes_salt
+    _KEY_CACHE.clear()
+    _FERNET_CACHE.clear()
+    _notes_salt = os.urandom(16)
+
+def _get_fernet(key):
+    """Return a cached Fernet instance for a derived key"""
+    fernet = _FERNET_CACHE.get(key)
+    if fernet is None:
+        from cryptography.fernet import Fernet
+        if len(_FERNET_CACHE) >= _FERNET_CACHE_SIZE:
+            _FERNET_CACHE.pop(next(iter(_FERNET_CACHE)))  # Drop the oldest entry
+        fernet = _FERNET_CACHE[key] = Fernet(key)
+    return fernet
+
+def get_notes_salt():
+    """Return the salt used to encrypt the notes file, reading it from disk on first use"""
+    global _notes_salt
+    if _notes_salt is None:
+        try:
+            with open(NOTES_FILE, 'rb') as f:
+                data = json_loads(f.read())
+            if isinstance(data, dict) and 'salt' in data:
+                _notes_salt = base64.b64decode(data['salt'])
+        except Exception:  # Includes a missing notes file
+            pass
+        if _notes_salt is None:
+            _notes_salt = os.urandom(16)
+    return _notes_salt
+
+def encrypt_data(data, password, salt=None):
+    """Encrypt data with password, generating a new salt unless one is given"""
+    key, salt = derive_key_from_password(password, salt)
+    fernet = _get_fernet(key)
+    encrypted_data = fernet.encrypt(json_dumps(data))
     return {
         'salt': base64.b64encode(salt).decode(),
-        'data': base64.b64encode(encrypted_data).decode()
+        'data': base64.b64encode(encrypted_data).decode(),
+        'kdf': KDF_SCRYPT
     }
 
+def is_encrypted_notes(data):
+    """True if loaded notes data is an encrypt_data() payload rather than a plain note list"""
+    return isinstance(data, dict) and 'salt' in data and 'data' in data
+
 def decrypt_data(encrypted_data, password):
     """Decrypt data with password"""
     try:
         salt = base64.b64decode(encrypted_data['salt'])
         data = base64.b64decode(encrypted_data['data'])
-        key, _ = derive_key_from_password(password, salt)
-        fernet = Fernet(key)
+        kdf = encrypted_data.get('kdf', KDF_PBKDF2)
+        key, _ = derive_key_from_password(password, salt, kdf)
+        fernet = _get_fernet(key)
         decrypted_data = fernet.decrypt(data)
-        return json.loads(decrypted_data.decode())
+        return json_loads(decrypted_data)
     except Exception:
         return None
 
 # Constants
-TRAY_ICON_THEMES = [
+TRAY_ICON_THEMES = (
     'default',      # Yellow
     'dark',         # Dark mode
     'oled',         # OLED safe
     'monochrome',   # Monochrome
-]
+)
+# Position of each theme in the settings dialog's theme combo box
+TRAY_ICON_THEME_INDEX = {theme: i for i, theme in enumerate(TRAY_ICON_THEMES)}
+# Themes whose tray icon only shows its text briefly (after launch or a tray click)
+_NEEDS_TEXT_GATING = frozenset({'oled'})
 
 # Utility for settings persistence
+DEFAULT_SETTINGS = {
+    'launch_on_startup': False,
+    'always_on_top': False,
+    'hotkey': 'ctrl+shift+s',
+    'reopen_notes': False,
+    'encrypt_notes': False,
+    'prompt_password_on_startup': False,
+    'tray_icon_theme': 'default',
+    'note_color': NOTE_BG_COLOR,  # Add note color to defaults
+    'note_text_color': NOTE_TEXT_COLOR,  # Add note text color to defaults
+    'note_text_size': NOTE_TEXT_SIZE,  # Add note text size to defaults
+    'note_font_family': NOTE_FONT_FAMILY,  # Add note font family to defaults
+    'hide_terminal': True,  # Default to hide terminal window
+}
+
 def load_settings():
-    if os.path.exists(SETTINGS_FILE):
-        with open(SETTINGS_FILE, 'r') as f:
-            settings = json.load(f)
-            # Ensure all required keys exist
-            default_settings = {
-                'launch_on_startup': False,
-                'always_on_top': False,
-                'hotkey': 'ctrl+shift+s',
-                'reopen_notes': False,
-                'encrypt_notes': False,
-                'prompt_password_on_startup': False,
-                'tray_icon_theme': 'default',
-                'note_color': NOTE_BG_COLOR,  # Add note color to defaults
-                'note_text_color': NOTE_TEXT_COLOR,  # Add note text color to defaults
-                'note_text_size': NOTE_TEXT_SIZE,  # Add note text size to defaults
-                'note_font_family': NOTE_FONT_FAMILY,  # Add note font family to defaults
-                'hide_terminal': True,  # Default to hide terminal window
-            }
-            # Update with any missing keys
-            for key, default_value in default_settings.items():
-                if key not in settings:
-                    settings[key] = default_value
-            return settings
-    return {
-        'launch_on_startup': False,
-        'always_on_top': False,
-        'hotkey': 'ctrl+shift+s',
-        'reopen_notes': False,
-        'encrypt_notes': False,
-        'prompt_password_on_startup': False,
-        'tray_icon_theme': 'default',
-        'note_color': NOTE_BG_COLOR,  # Add note color to defaults
-        'note_text_color': NOTE_TEXT_COLOR,  # Add note text color to defaults
-        'note_text_size': NOTE_TEXT_SIZE,  # Add note text size to defaults
-        'note_font_family': NOTE_FONT_FAMILY,  # Add note font family to defaults
-        'hide_terminal': True,  # Default to hide terminal window
-    }
+    try:
+        with open(SETTINGS_FILE, 'rb') as f:
+            settings = json_loads(f.read())
+    except FileNotFoundError:
+        return dict(DEFAULT_SETTINGS)
+    # Ensure all required keys exist
+    for key, default_value in DEFAULT_SETTINGS.items():
+        if key not in settings:
+            settings[key] = default_value
+    return settings
 
 def verify_encryption_password():
     """Prompt user for encryption password and verify it"""
@@ -133,133 +198,284 @@ def verify_encryption_password():
     
     # Try to decrypt a test with the provided password
     try:
-        if os.path.exists(NOTES_FILE):
-            with open(NOTES_FILE, 'r') as f:
-                data = json.load(f)
-            
-            # Check if data is encrypted
-            if isinstance(data, dict) and 'salt' in data and 'data' in data:
-                decrypted_data = decrypt_data(data, password)
-                return decrypted_data is not None
-    except Exception:
+        with open(NOTES_FILE, 'rb') as f:
+            data = json_loads(f.read())
+        
+        # Check if data is encrypted
+        if is_encrypted_notes(data):
+            decrypted_data = decrypt_data(data, password)
+            return decrypted_data is not None
+    except Exception:  # Includes a missing notes file
         pass
     
     return False
 
 def save_settings(settings):
-    with open(SETTINGS_FILE, 'w') as f:
-        json.dump(settings, f, separators=(',', ':'))  # Optimized - no pretty formatting
+    write_file_atomic(SETTINGS_FILE, json_dumps(settings))  # Optimized - no pretty formatting
+
+def write_file_atomic(path, data):
+    """Write bytes via QSaveFile, which only replaces the file once the whole write succeeded"""
+    f = QSaveFile(path)
+    if not f.open(QIODevice.OpenModeFlag.WriteOnly):
+        raise OSError(f"Could not open {path} for writing: {f.errorString()}")
+    f.write(data)
+    if not f.commit():
+        raise OSError(f"Could not write {path}: {f.errorString()}")
 
 # Utility for notes persistence
-def save_notes(notes, settings):
+# Serializes writers of NOTES_FILE (background saves and direct rewrites)
+_notes_file_lock = threading.Lock()
+# Bytes of the last plain-text notes write (None after an encrypted one); guarded by _notes_file_lock
+_last_notes_payload = None
+
+def write_notes_file(payload, encrypted=False):
+    """Atomically write NOTES_FILE, skipping a plain-text write identical to the last one.
+
+    Encrypted payloads always differ (Fernet uses a fresh IV), so they are never compared.
+    Call with _notes_file_lock held.
+    """
+    global _last_notes_payload
+    if not encrypted and payload == _last_notes_payload:
+        return
+    write_file_atomic(NOTES_FILE, payload)
+    _last_notes_payload = None if encrypted else payload
+
+def snapshot_notes(notes):
+    """Collect the data to save from the note widgets; must run on the UI thread"""
     notes_data = []
     valid_notes = 0
     
     for note in notes:
-        if hasattr(note, 'is_deleted') and note.is_deleted:
+        if note.is_deleted:
             continue  # Skip deleted notes
         
         # Limit number of notes to save
         if valid_notes >= MAX_NOTES_TO_SAVE:
             break
             
-        # Get note text and limit length
-        note_text = note.text_edit.toPlainText()
-        if len(note_text) > MAX_NOTE_TEXT_LENGTH:
-            note_text = note_text[:MAX_NOTE_TEXT_LENGTH] + "..."
+        # Get note text (its length is capped as it is typed); only re-read the document if the text changed
+        if note._text_dirty:
+            note._cached_text = note.text_edit.toPlainText()
+            note._text_dirty = False
+        note_text = note._cached_text
         
         note_data = {
-            'geometry': {
-                'x': note.geometry().x(),
-                'y': note.geometry().y(),
-                'width': note.geometry().width(),
-                'height': note.geometry().height()
-            },
+            'g': note.geometry_tuple(),  # [x, y, width, height]
             'text': note_text,
-            'pinned': getattr(note, 'pinned', False)  # Save pin state
         }
+        if note.pinned:
+            note_data['pinned'] = True  # Save pin state; omitted (read as False) for unpinned notes
         notes_data.append(note_data)
         valid_notes += 1
-    
+    return notes_data
+
+def write_notes(notes_data, settings):
+    """Encrypt (if enabled) and write a notes snapshot; safe to call from a worker thread"""
     # Check if encryption is enabled
     if settings.get('encrypt_notes', False):
         password = get_password_from_credential_manager()
         if password:
-            encrypted_data = encrypt_data(notes_data, password)
-            with open(NOTES_FILE, 'w') as f:
-                json.dump(encrypted_data, f)
+            encrypted_data = encrypt_data(notes_data, password, get_notes_salt())
+            write_notes_file(json_dumps(encrypted_data), encrypted=True)
         else:
             # Fallback to unencrypted if no password
-            with open(NOTES_FILE, 'w') as f:
-                json.dump(notes_data, f)
+            write_notes_file(json_dumps(notes_data))
     else:
         # Save unencrypted (optimized - no pretty formatting to save space)
-        with open(NOTES_FILE, 'w') as f:
-            json.dump(notes_data, f, separators=(',', ':'))
+        write_notes_file(json_dumps(notes_data))
+
+class SaveNotesTask(QRunnable):
+    """Encrypts and writes a notes snapshot off the UI thread so auto-save never stalls typing.
+
+    take_pending returns the newest (notes_data, settings) snapshot, so a save that
+    waited in the queue writes the latest state rather than a stale one.
+    report_error is called with the exception if the write fails.
+    """
+    def __init__(self, take_pending, report_error):
+        super().__init__()
+        self.take_pending = take_pending
+        self.report_error = report_error
+
+    def run(self):
+        pending = self.take_pending()
+        if pending is None:
+            return
+        notes_data, settings = pending
+        try:
+            with _notes_file_lock:
+                write_notes(notes_data, settings)
+        except Exception as e:
+            self.report_error(e)
 
 def load_notes(settings):
-    if not os.path.exists(NOTES_FILE):
-        return []
+    """Return (notes, decrypted); decrypted is True only if an encrypted file was read successfully"""
+    try:
+        with open(NOTES_FILE, 'rb') as f:
+            raw = f.read()
+    except FileNotFoundError:
+        return [], False
     
     try:
-        with open(NOTES_FILE, 'r') as f:
-            data = json.load(f)
+        data = json_loads(raw)
         
         # Check if data is encrypted
-        if isinstance(data, dict) and 'salt' in data and 'data' in data:
+        if is_encrypted_notes(data):
             # Data is encrypted
             if settings.get('encrypt_notes', False):
                 password = get_password_from_credential_manager()
                 if password:
                     decrypted_data = decrypt_data(data, password)
                     if decrypted_data is not None:
-                        return decrypted_data
+                        return decrypted_data, True
                     else:
                         # Wrong password
                         QMessageBox.warning(None, "Encryption Error", 
                                           "Incorrect password. Notes could not be decrypted.")
-                        return []
+                        return [], False
                 else:
                     # No password set
                     QMessageBox.warning(None, "Encryption Error", 
                                       "Encryption is enabled but no password is set in Windows Credential Manager.")
-                    return []
+                    return [], False
             else:
                 # Encryption disabled but data is encrypted
                 QMessageBox.warning(None, "Encryption Error", 
                                   "Notes are encrypted but encryption is disabled in settings.")
-                return []
+                return [], False
         else:
             # Data is not encrypted
-            return data
+            return data, False
     except Exception as e:
         QMessageBox.warning(None, "Load Error", f"Could not load notes: {str(e)}")
-        return []
+        return [], False
 
-# Startup shortcut management (Windows)
-def set_startup(enabled):
-    startup_path = os.path.join(os.environ['APPDATA'], r'Microsoft\Windows\Start Menu\Programs\Startup')
-    shortcut_path = os.path.join(startup_path, f'{APP_NAME}.lnk')
-    script = os.path.abspath(__file__)
+# Outcomes of rewriting the notes file in plain text
+DECRYPT_NOT_ENCRYPTED = 'not_encrypted'
+DECRYPT_DONE = 'done'
+DECRYPT_NO_PASSWORD = 'no_password'
+DECRYPT_BAD_PASSWORD = 'bad_password'
+
+def decrypt_notes_file():
+    """Rewrite an encrypted notes file in plain text and return a DECRYPT_* outcome.
+
+    Does no UI work, so it can run on a worker thread; I/O errors propagate.
+    """
+    # Load notes to check if they're actually encrypted
+    try:
+        with open(NOTES_FILE, 'rb') as f:
+            # Plain notes are a JSON list and encrypted ones an object, so the first
+            # byte settles it without parsing a plain file at all
+            if f.read(64).lstrip()[:1] != b'{':
+                return DECRYPT_NOT_ENCRYPTED
+            f.seek(0)
+            data = json_loads(f.read())
+    except FileNotFoundError:
+        return DECRYPT_NOT_ENCRYPTED  # No file to decrypt
     
-    # Try to find the virtual environment Python interpreter
-    venv_python = None
-    script_dir = os.path.dirname(script)
+    # Check if data is encrypted
+    if not is_encrypted_notes(data):
+        return DECRYPT_NOT_ENCRYPTED
     
-    # Look for venv in the same directory as the script
-    venv_path = os.path.join(script_dir, 'venv', 'Scripts', 'python.exe')
-    if os.path.exists(venv_path):
-        venv_python = venv_path
-    else:
-        # Look for venv in parent directory
-        parent_venv_path = os.path.join(os.path.dirname(script_dir), 'venv', 'Scripts', 'python.exe')
-        if os.path.exists(parent_venv_path):
-            venv_python = parent_venv_path
+    # Data is encrypted, so we need a password
+    password = get_password_from_credential_manager()
+    if not password:
+        return DECRYPT_NO_PASSWORD
+    
+    decrypted_data = decrypt_data(data, password)
+    if decrypted_data is None:
+        return DECRYPT_BAD_PASSWORD
+    
+    # Save decrypted data in plain text format, atomically so a crash can't leave half a file
+    with _notes_file_lock:
+        write_notes_file(json_dumps(decrypted_data))
+    return DECRYPT_DONE
+
+class TaskSignals(QObject):
+    """Signals for QRunnable tasks, which can't define signals themselves"""
+    finished = pyqtSignal()
+
+class DecryptNotesTask(QRunnable):
+    """Runs decrypt_notes_file off the UI thread; read outcome/error after finished"""
+    def __init__(self):
+        super().__init__()
+        self.setAutoDelete(False)  # The caller reads the outcome after run() returns
+        self.signals = TaskSignals()
+        self.outcome = None
+        self.error = None
+
+    def run(self):
+        try:
+            self.outcome = decrypt_notes_file()
+        except Exception as e:
+            self.error = e
+        self.signals.finished.emit()
+
+# (ok, message) reported for each decrypt_notes_file outcome
+_DECRYPT_RESULTS = {
+    DECRYPT_NOT_ENCRYPTED: (True, None),
+    DECRYPT_DONE: (True, "Notes have been decrypted and saved in plain text format."),
+    DECRYPT_NO_PASSWORD: (False, "No encryption password found. Cannot decrypt notes."),
+    DECRYPT_BAD_PASSWORD: (False, "Failed to decrypt notes with current password."),
+}
+
+def decrypt_and_resave_notes(parent=None):
+    """Decrypt notes and save them in plain text format.
+
+    Returns (ok, message) and leaves reporting to the caller; message is None
+    when the file was not encrypted.
+    """
+    # Key derivation and decryption are CPU heavy, so run them on a worker and keep the
+    # event loop (and a busy indicator) running until the worker is done
+    task = DecryptNotesTask()
+    loop = QEventLoop()
+    task.signals.finished.connect(loop.quit)
+    progress = QProgressDialog("Decrypting notes...", None, 0, 0, parent)
+    progress.setWindowTitle("StickyPosts")
+    progress.setWindowModality(Qt.WindowModality.ApplicationModal)
+    progress.setMinimumDuration(0)
+    progress.show()
+    QThreadPool.globalInstance().start(task)
+    loop.exec()
+    progress.close()
+    
+    if task.error is not None:
+        return False, f"Error during decryption: {str(task.error)}"
+    return _DECRYPT_RESULTS[task.outcome]
+
+# Startup shortcut management (Windows)
+# The script location can't change while the app runs, so resolve it once
+_SCRIPT_PATH = os.path.abspath(__file__)
+_SCRIPT_DIR = os.path.dirname(_SCRIPT_PATH)
+
+@functools.lru_cache(maxsize=None)
+def _startup_dir():
+    return os.path.join(os.environ['APPDATA'], r'Microsoft\Windows\Start Menu\Programs\Startup')
+
+@functools.lru_cache(maxsize=None)
+def _discover_venv_python():
+    """Find a venv Python interpreter next to the script or in its parent directory"""
+    for base_dir in (_SCRIPT_DIR, os.path.dirname(_SCRIPT_DIR)):
+        venv_path = os.path.join(base_dir, 'venv', 'Scripts', 'python.exe')
+        if os.path.exists(venv_path):
+            return venv_path
+    return None
+
+# (target, script) of the shortcut this process last wrote, so saving settings
+# doesn't start COM and rewrite an identical shortcut every time
+_startup_shortcut_written = None
+
+def set_startup(enabled):
+    global _startup_shortcut_written
+    shortcut_path = os.path.join(_startup_dir(), f'{APP_NAME}.lnk')
+    script = _SCRIPT_PATH
     
     # Use venv Python if found, otherwise fall back to system Python
-    target = venv_python if venv_python else sys.executable
+    target = _discover_venv_python() or sys.executable
     
     if enabled:
+        if _startup_shortcut_written == (target, script) and os.path.exists(shortcut_path):
+            return  # Shortcut already up to date
+        import win32com.client  # For startup shortcut
         shell = win32com.client.Dispatch('WScript.Shell')
         shortcut = shell.CreateShortCut(shortcut_path)
         shortcut.Targetpath = target
@@ -267,46 +483,72 @@ def set_startup(enabled):
         shortcut.WorkingDirectory = os.path.dirname(script)
         shortcut.IconLocation = script
         shortcut.save()
+        _startup_shortcut_written = (target, script)
     else:
-        if os.path.exists(shortcut_path):
+        _startup_shortcut_written = None
+        try:
             os.remove(shortcut_path)
+        except FileNotFoundError:
+            pass
 
 # Secure password management using Windows Credential Manager
+# The decoded password is kept briefly in memory so encrypted auto-saves don't
+# round-trip to the Credential Manager every time
+PASSWORD_CACHE_TTL = 300  # seconds
+_password_cache = (None, 0.0)  # (password, time.monotonic() when read)
+# The UI thread and the save worker both read the password; the lock makes one
+# of them do the CredRead while the other waits for its result
+_password_cache_lock = threading.Lock()
+
+def _set_password_cache(password):
+    global _password_cache
+    with _password_cache_lock:
+        _password_cache = (password, time.monotonic())
+
 def save_password_to_credential_manager(password):
     """Save password securely to Windows Credential Manager"""
+    import win32cred
     try:
         # Create credential structure with proper encoding
         cred = {
             'TargetName': CREDENTIAL_TARGET,
             'UserName': 'stickyposts_user',
-            'CredentialBlob': password,  # Remove encoding, let win32cred handle it
+            'CredentialBlob': password.encode('utf-16-le'),  # Store bytes so reads decode one known format
             'Type': win32cred.CRED_TYPE_GENERIC,
             'Persist': win32cred.CRED_PERSIST_SESSION
         }
         win32cred.CredWrite(cred)
+        clear_key_cache()
+        _set_password_cache(password)
         return True
     except Exception as e:
         print(f"Credential save error: {e}")
         return False
 
 def get_password_from_credential_manager():
-    """Retrieve password from Windows Credential Manager"""
-    try:
-        cred = win32cred.CredRead(CREDENTIAL_TARGET, win32cred.CRED_TYPE_GENERIC)
-        # Handle both string and bytes return types
-        password_blob = cred['CredentialBlob']
-        if isinstance(password_blob, bytes):
-            return password_blob.decode('utf-16-le')
-        else:
-            return password_blob
-    except Exception as e:
-        # Only print error if it's not 'Element not found' (1168)
-        if getattr(e, 'winerror', None) != 1168:
-            print(f"Credential read error: {e}")
-        return None
+    """Retrieve password from Windows Credential Manager (cached for PASSWORD_CACHE_TTL seconds)"""
+    global _password_cache
+    with _password_cache_lock:
+        password, read_at = _password_cache
+        if password is not None and time.monotonic() - read_at < PASSWORD_CACHE_TTL:
+            return password
+        import win32cred
+        try:
+            cred = win32cred.CredRead(CREDENTIAL_TARGET, win32cred.CRED_TYPE_GENERIC)
+            password = cred['CredentialBlob'].decode('utf-16-le')
+            _password_cache = (password, time.monotonic())
+            return password
+        except Exception as e:
+            # Only print error if it's not 'Element not found' (1168)
+            if getattr(e, 'winerror', None) != 1168:
+                print(f"Credential read error: {e}")
+            return None
 
 def delete_password_from_credential_manager():
     """Delete password from Windows Credential Manager"""
+    import win32cred
+    _set_password_cache(None)
+    clear_key_cache()  # Keys derived from the removed password must not outlive it
     try:
         win32cred.CredDelete(CREDENTIAL_TARGET, win32cred.CRED_TYPE_GENERIC)
         return True
@@ -316,45 +558,64 @@ def delete_password_from_credential_manager():
 
 def cleanup_old_settings():
     """Remove old encryption_password field from settings file"""
-    if os.path.exists(SETTINGS_FILE):
-        try:
-            with open(SETTINGS_FILE, 'r') as f:
-                settings = json.load(f)
-            
-            # Remove old encryption_password field if it exists
-            if 'encryption_password' in settings:
-                del settings['encryption_password']
-                with open(SETTINGS_FILE, 'w') as f:
-                    json.dump(settings, f, indent=2)
-                print("Cleaned up old encryption_password field from settings")
-            
-            # Also ensure we have all required fields
-            required_fields = {
-                'launch_on_startup': False,
-                'always_on_top': False,
-                'hotkey': 'ctrl+shift+s',
-                'reopen_notes': False,
-                'encrypt_notes': False,
-            }
-            
-            updated = False
-            for field, default_value in required_fields.items():
-                if field not in settings:
-                    settings[field] = default_value
-                    updated = True
+    try:
+        with open(SETTINGS_FILE, 'rb') as f:
+            settings = json_loads(f.read())
+        
+        updated = False
+        
+        # Remove old encryption_password field if it exists
+        if 'encryption_password' in settings:
+            del settings['encryption_password']
+            updated = True
+            print("Cleaned up old encryption_password field from settings")
+        
+        # Also ensure we have all required fields
+        required_fields = {
+            'launch_on_startup': False,
+            'always_on_top': False,
+            'hotkey': 'ctrl+shift+s',
+            'reopen_notes': False,
+            'encrypt_notes': False,
+        }
+        
+        for field, default_value in required_fields.items():
+            if field not in settings:
+                settings[field] = default_value
+                updated = True
+        
+        # Write back once, only if something changed
+        if updated:
+            save_settings(settings)
+            print("Updated settings file")
             
-            if updated:
-                with open(SETTINGS_FILE, 'w') as f:
-                    json.dump(settings, f, indent=2)
-                print("Updated settings with missing fields")
-                
-        except Exception as e:
-            print(f"Error cleaning up settings: {e}")
+    except FileNotFoundError:
+        pass  # No settings file yet, nothing to clean up
+    except Exception as e:
+        print(f"Error cleaning up settings: {e}")
+
+def adjust_color(hex_color, factor):
+    """Simple lighten/darken by factor (0.0-1.0 darken, >1.0 lighten)"""
+    r, g, b = bytes.fromhex(hex_color.lstrip('#'))
+    r = min(255, int(r * factor))
+    g = min(255, int(g * factor))
+    b = min(255, int(b * factor))
+    return f'#{r:02X}{g:02X}{b:02X}'
+
+# Note colors come from a small palette and rarely change, so each color's shades are computed once
+@functools.lru_cache(maxsize=64)
+def button_shades(base_color):
+    """Return the (close, add, pin) button backgrounds for a note color"""
+    return (
+        adjust_color(base_color, 0.95),  # Slightly darker
+        adjust_color(base_color, 1.08),  # Slightly lighter
+        adjust_color(base_color, 1.15),  # Even lighter
+    )
 
 # Add a helper to generate tray icons
-from PyQt6.QtGui import QPixmap, QPainter, QColor, QIcon
-
+@functools.lru_cache(maxsize=16)
 def get_tray_icon(theme, show_text=True):
+    """Render the tray icon for a theme; each (theme, show_text) variant is painted only once"""
     pixmap = QPixmap(16, 16)
     painter = QPainter(pixmap)
     if theme == 'dark':
@@ -382,9 +643,49 @@ def get_tray_icon(theme, show_text=True):
     icon.addPixmap(pixmap)
     return icon
 
+def _resize_direction(code):
+    """Resize direction for an edge bitmask (1 left, 2 right, 4 top, 8 bottom); corners win over edges"""
+    left, right, top, bottom = code & 1, code & 2, code & 4, code & 8
+    if top and left:
+        return 'topleft'
+    if top and right:
+        return 'topright'
+    if bottom and left:
+        return 'bottomleft'
+    if bottom and right:
+        return 'bottomright'
+    for edge, direction in ((left, 'left'), (right, 'right'), (top, 'top'), (bottom, 'bottom')):
+        if edge:
+            return direction
+    return None
+
 # Main Sticky Note Window
 class StickyNote(QWidget):
     EDGE_MARGIN = 8  # px for resize area
+    # Which edges (left, top, right, bottom) follow the cursor for each resize direction
+    _RESIZE_EDGES = {
+        'left': (True, False, False, False),
+        'right': (False, False, True, False),
+        'top': (False, True, False, False),
+        'bottom': (False, False, False, True),
+        'topleft': (True, True, False, False),
+        'topright': (False, True, True, False),
+        'bottomleft': (True, False, False, True),
+        'bottomright': (False, False, True, True),
+    }
+    # (is_resize_area, direction) for every edge bitmask built in _resize_code
+    _RESIZE_AREAS = tuple((direction is not None, direction) for direction in map(_resize_direction, range(16)))
+    _RESIZE_CURSORS = {
+        'left': Qt.CursorShape.SizeHorCursor,
+        'right': Qt.CursorShape.SizeHorCursor,
+        'top': Qt.CursorShape.SizeVerCursor,
+        'bottom': Qt.CursorShape.SizeVerCursor,
+        'topleft': Qt.CursorShape.SizeFDiagCursor,
+        'bottomright': Qt.CursorShape.SizeFDiagCursor,
+        'topright': Qt.CursorShape.SizeBDiagCursor,
+        'bottomleft': Qt.CursorShape.SizeBDiagCursor,
+        None: Qt.CursorShape.ArrowCursor,
+    }
 
     def __init__(self, app, settings, text="", geometry=None, pinned=False):
         super().__init__(flags=Qt.WindowType.FramelessWindowHint | Qt.WindowType.WindowStaysOnTopHint if settings['always_on_top'] else Qt.WindowType.FramelessWindowHint)
@@ -394,10 +695,17 @@ class StickyNote(QWidget):
         self.dragging = False
         self.resize_dir = None
         self.drag_pos = None
+        self._last_resize_code = None  # Edge bitmask the cursor shape was last set for
         self.is_deleted = False  # Track if note was deleted
-        self.pinned = pinned  # Track if note is individually pinned
+        self._dirty = True  # Changed since the last save
+        self._text_dirty = True  # Text changed since _cached_text was taken
+        self._cached_text = ''
+        self._last_geometry = None  # Cached (x, y, w, h), reset on move/resize
+        self.pinned = bool(pinned)  # Track if note is individually pinned
         self.setMinimumSize(NOTE_MIN_SIZE)
-        self.setStyleSheet(f"background: {self.settings.get('note_color', NOTE_BG_COLOR)}; border: 1px solid #e0e0a0;")
+        self._note_color = self.settings.get('note_color', NOTE_BG_COLOR)  # Color the stylesheets were built for
+        self._text_style = None  # (text color, size, font family) last applied to text_edit
+        self.setStyleSheet(f"background: {self._note_color}; border: 1px solid #e0e0a0;")
         self.setWindowTitle(APP_NAME)
         self.setWindowIcon(QIcon())  # Set empty icon to prevent taskbar icon
         self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground, False)
@@ -408,28 +716,23 @@ class StickyNote(QWidget):
         
         # Set geometry if provided (for reopening notes)
         if geometry:
-            self.setGeometry(geometry['x'], geometry['y'], geometry['width'], geometry['height'])
+            if isinstance(geometry, dict):  # Legacy {'x', 'y', 'width', 'height'} format
+                geometry = (geometry['x'], geometry['y'], geometry['width'], geometry['height'])
+            self.setGeometry(*geometry)
         
         # Text area
-        self.text_edit = QTextEdit(self)
+        # Notes are plain text; QPlainTextEdit skips QTextEdit's rich-text layout machinery
+        self.text_edit = QPlainTextEdit(self)
         self._apply_text_style()
-        self.text_edit.setText(text)
+        self.text_edit.setPlainText(text[:MAX_NOTE_TEXT_LENGTH])
 
-        # Set maximum text length to prevent excessive memory usage
-        doc = self.text_edit.document()
-        if doc is not None:
-            try:
-                doc.setMaximumBlockCount(MAX_NOTE_TEXT_LENGTH // 100)  # Approximate blocks
-            except Exception as e:
-                print(f"Warning: Could not set maximum block count: {e}")
+        # MAX_NOTE_TEXT_LENGTH is enforced in _on_text_changed; no block-count cap, which would
+        # silently drop lines from the top of the note and disable undo
+        self._last_insert_end = 0  # Document position just past the latest insertion
+        self.text_edit.document().contentsChange.connect(self._on_contents_change)
 
         # Connect text change signal for auto-save
         self.text_edit.textChanged.connect(self._on_text_changed)
-        # Auto-save timer
-        from PyQt6.QtCore import QTimer
-        self.auto_save_timer = QTimer()
-        self.auto_save_timer.setSingleShot(True)
-        self.auto_save_timer.timeout.connect(self._auto_save)
         
         # Top-right buttons
         self.pin_btn = QPushButton('📌', self)
@@ -444,7 +747,7 @@ class StickyNote(QWidget):
         self.add_btn = QPushButton('+', self)
         self.add_btn.setFixedSize(24, 24)
         self.add_btn.clicked.connect(lambda: self.app.create_note("", pinned=False))
-        self._update_button_colors(self.settings.get('note_color', NOTE_BG_COLOR))
+        self._update_button_colors(self._note_color)
         
         # Layout
         btn_layout = QHBoxLayout()
@@ -462,34 +765,49 @@ class StickyNote(QWidget):
         # Remove window shadow
         self.setWindowFlag(Qt.WindowType.NoDropShadowWindowHint, True)
         
-        # Install event filter to catch mouse events on child widgets
-        self.text_edit.installEventFilter(self)
-        self.close_btn.installEventFilter(self)
-        self.add_btn.installEventFilter(self)
-        self.pin_btn.installEventFilter(self)
+        # Track hover on the note itself so the resize cursor shows along the frame;
+        # the buttons keep a plain arrow instead of inheriting the resize cursor
+        self.setMouseTracking(True)
+        for btn in (self.pin_btn, self.add_btn, self.close_btn):
+            btn.setCursor(QCursor(Qt.CursorShape.ArrowCursor))
         
         self.show()
 
+    def _on_contents_change(self, position, chars_removed, chars_added):
+        if chars_added:
+            self._last_insert_end = position + chars_added
+
     def _on_text_changed(self):
         """Trigger auto-save when text changes"""
-        # Reset timer - will save after AUTO_SAVE_DELAY milliseconds of no typing
-        self.auto_save_timer.start(AUTO_SAVE_DELAY)
-
-    def _auto_save(self):
-        """Auto-save the current note"""
-        if self.app.settings.get('reopen_notes', False):
-            self.app._save_notes()
+        # Enforce MAX_NOTE_TEXT_LENGTH as text arrives by dropping the overflow from the end
+        # of the latest insertion; characterCount() counts the final paragraph separator
+        doc = self.text_edit.document()
+        excess = doc.characterCount() - 1 - MAX_NOTE_TEXT_LENGTH
+        if excess > 0:
+            end = min(self._last_insert_end, doc.characterCount() - 1)
+            cursor = QTextCursor(doc)
+            cursor.setPosition(max(0, end - excess))
+            cursor.setPosition(end, QTextCursor.MoveMode.KeepAnchor)
+            # Merge the trim into the insertion's undo step, so undo removes the whole paste
+            cursor.joinPreviousEditBlock()
+            cursor.removeSelectedText()
+            cursor.endEditBlock()  # Re-enters this handler with the text within the limit
+            return
+        self._dirty = True
+        self._text_dirty = True
+        # Restart the app-wide save timer - saves after AUTO_SAVE_DELAY milliseconds of no typing
+        self.app.schedule_save()
 
     def _toggle_pin(self):
         """Toggle the pin state of this note"""
         self.pinned = not self.pinned
+        self._dirty = True
         self.setWindowFlag(Qt.WindowType.WindowStaysOnTopHint, self.settings['always_on_top'] or self.pinned)
         self.show()  # Need to show after changing window flags
         self._update_pin_button_style()
         
-        # Save notes to persist pin state
-        if self.app.settings.get('reopen_notes', False):
-            self.app._save_notes()
+        # Persist pin state with the next batched save
+        self.app.schedule_save()
 
     def _update_pin_button_style(self):
         """Update the pin button appearance based on pin state"""
@@ -498,17 +816,7 @@ class StickyNote(QWidget):
             self.pin_btn.setToolTip('Unpin note')
         else:
             # Use the current note color for unpinned state
-            pin_bg = self.settings.get('note_color', NOTE_BG_COLOR)
-            def adjust_color(hex_color, factor):
-                hex_color = hex_color.lstrip('#')
-                r = int(hex_color[0:2], 16)
-                g = int(hex_color[2:4], 16)
-                b = int(hex_color[4:6], 16)
-                r = min(255, max(0, int(r * 1.15)))
-                g = min(255, max(0, int(g * 1.15)))
-                b = min(255, max(0, int(b * 1.15)))
-                return f'#{r:02X}{g:02X}{b:02X}'
-            pin_bg = adjust_color(pin_bg, 1.15)
+            pin_bg = button_shades(self.settings.get('note_color', NOTE_BG_COLOR))[2]
             self.pin_btn.setStyleSheet(f"QPushButton {{ background: {pin_bg}; border: none; font-weight: bold; color: black; }} QPushButton:hover {{ background: #f0f0b0; }}")
             self.pin_btn.setToolTip('Pin note on top')
 
@@ -516,19 +824,25 @@ class StickyNote(QWidget):
         """Mark note as deleted and close it"""
         self.is_deleted = True
         self.app.notes.remove(self)
-        # Save immediately when note is deleted
-        if self.app.settings.get('reopen_notes', False):
-            self.app._save_notes()
+        self.app._notes_changed = True
+        self.app.schedule_save()
         self.close()
 
-    def eventFilter(self, obj, event):
-        if event.type() == event.Type.MouseMove:
-            # Convert child widget coordinates to parent coordinates
-            child_pos = event.pos()
-            global_pos = obj.mapToGlobal(child_pos)
-            parent_pos = self.mapFromGlobal(global_pos)
-            self._update_cursor(parent_pos)
-        return super().eventFilter(obj, event)
+    def moveEvent(self, event):
+        self._dirty = True
+        self._last_geometry = None
+        super().moveEvent(event)
+
+    def resizeEvent(self, event):
+        self._dirty = True
+        self._last_geometry = None
+        super().resizeEvent(event)
+
+    def geometry_tuple(self):
+        """Return the note geometry as (x, y, width, height), cached until it moves or resizes"""
+        if self._last_geometry is None:
+            self._last_geometry = self.geometry().getRect()
+        return self._last_geometry
 
     # --- Resizing logic ---
     def mousePressEvent(self, event: QMouseEvent):
@@ -541,13 +855,13 @@ class StickyNote(QWidget):
         super().mousePressEvent(event)
 
     def mouseMoveEvent(self, event: QMouseEvent):
-        # Always update cursor first, regardless of state
-        self._update_cursor(event.pos())
-        
         if self.resizing:
             self._resize_window(event.globalPosition().toPoint())
         elif self.dragging:
             self._move_window(event.globalPosition().toPoint())
+        else:
+            # The cursor shape can't change in the middle of a drag or resize
+            self._update_cursor(event.pos())
         
         super().mouseMoveEvent(event)
 
@@ -563,142 +877,70 @@ class StickyNote(QWidget):
             new_pos = global_pos - self.drag_pos
             self.move(new_pos)
 
-    def _check_resize_area(self, pos):
+    def _resize_code(self, pos):
+        """Bitmask of the edges pos is within EDGE_MARGIN of (1 left, 2 right, 4 top, 8 bottom)"""
         rect = self.rect()
-        x, y, w, h = pos.x(), pos.y(), rect.width(), rect.height()
+        x, y = pos.x(), pos.y()
         margin = self.EDGE_MARGIN
-        # Corners
-        if x < margin and y < margin:
-            return True, 'topleft'
-        if x > w - margin and y < margin:
-            return True, 'topright'
-        if x < margin and y > h - margin:
-            return True, 'bottomleft'
-        if x > w - margin and y > h - margin:
-            return True, 'bottomright'
-        # Edges
-        if x < margin:
-            return True, 'left'
-        if x > w - margin:
-            return True, 'right'
-        if y < margin:
-            return True, 'top'
-        if y > h - margin:
-            return True, 'bottom'
-        return False, None
+        return ((x < margin) | (x > rect.width() - margin) << 1
+                | (y < margin) << 2 | (y > rect.height() - margin) << 3)
+
+    def _check_resize_area(self, pos):
+        return self._RESIZE_AREAS[self._resize_code(pos)]
 
     def _update_cursor(self, pos):
-        is_resize_area, dir = self._check_resize_area(pos)
-        cursors = {
-            'left': Qt.CursorShape.SizeHorCursor,
-            'right': Qt.CursorShape.SizeHorCursor,
-            'top': Qt.CursorShape.SizeVerCursor,
-            'bottom': Qt.CursorShape.SizeVerCursor,
-            'topleft': Qt.CursorShape.SizeFDiagCursor,
-            'bottomright': Qt.CursorShape.SizeFDiagCursor,
-            'topright': Qt.CursorShape.SizeBDiagCursor,
-            'bottomleft': Qt.CursorShape.SizeBDiagCursor,
-        }
-        if is_resize_area and dir in cursors:
-            self.setCursor(QCursor(cursors[dir]))
-        else:
-            self.setCursor(QCursor(Qt.CursorShape.ArrowCursor))
+        code = self._resize_code(pos)
+        if code == self._last_resize_code:
+            return  # Same zone as the last move, the cursor is already right
+        self._last_resize_code = code
+        self.setCursor(QCursor(self._RESIZE_CURSORS[self._RESIZE_AREAS[code][1]]))
 
     def _resize_window(self, global_pos):
         geo = self.geometry()
-        minw, minh = self.minimumWidth(), self.minimumHeight()
-        dx = global_pos.x() - geo.x()
-        dy = global_pos.y() - geo.y()
-        dir = self.resize_dir
-        if dir == 'left':
-            diff = dx
-            new_x = geo.x() + diff
-            new_w = geo.width() - diff
-            if new_w >= minw:
-                self.setGeometry(new_x, geo.y(), new_w, geo.height())
-        elif dir == 'right':
-            new_w = dx
-            if new_w >= minw:
-                self.resize(new_w, geo.height())
-        elif dir == 'top':
-            diff = dy
-            new_y = geo.y() + diff
-            new_h = geo.height() - diff
-            if new_h >= minh:
-                self.setGeometry(geo.x(), new_y, geo.width(), new_h)
-        elif dir == 'bottom':
-            new_h = dy
-            if new_h >= minh:
-                self.resize(geo.width(), new_h)
-        elif dir == 'topleft':
-            diffx = dx
-            diffy = dy
-            new_x = geo.x() + diffx
-            new_y = geo.y() + diffy
-            new_w = geo.width() - diffx
-            new_h = geo.height() - diffy
-            if new_w >= minw and new_h >= minh:
-                self.setGeometry(new_x, new_y, new_w, new_h)
-        elif dir == 'topright':
-            diffx = dx - geo.width()
-            diffy = dy
-            new_y = geo.y() + diffy
-            new_w = geo.width() + diffx
-            new_h = geo.height() - diffy
-            if new_w >= minw and new_h >= minh:
-                self.setGeometry(geo.x(), new_y, new_w, new_h)
-        elif dir == 'bottomleft':
-            diffx = dx
-            diffy = dy - geo.height()
-            new_x = geo.x() + diffx
-            new_w = geo.width() - diffx
-            new_h = geo.height() + diffy
-            if new_w >= minw and new_h >= minh:
-                self.setGeometry(new_x, geo.y(), new_w, new_h)
-        elif dir == 'bottomright':
-            diffx = dx - geo.width()
-            diffy = dy - geo.height()
-            new_w = geo.width() + diffx
-            new_h = geo.height() + diffy
-            if new_w >= minw and new_h >= minh:
-                self.resize(new_w, new_h)
-
-    def _apply_text_style(self):
-        text_color = self.settings.get('note_text_color', NOTE_TEXT_COLOR)
-        text_size = self.settings.get('note_text_size', NOTE_TEXT_SIZE)
-        font_family = self.settings.get('note_font_family', NOTE_FONT_FAMILY)
-        self.text_edit.setStyleSheet(f"background: transparent; border: none; font-size: {text_size}px; color: {text_color}; font-family: '{font_family}';")
-
-    def update_note_color(self, color=None, text_color=None, text_size=None, font_family=None):
-        """Update the note background, text color, text size, and font dynamically and update button colors."""
-        if color is None:
-            color = self.settings.get('note_color', NOTE_BG_COLOR)
+        x, y, w, h = geo.x(), geo.y(), geo.width(), geo.height()
+        dx = global_pos.x() - x
+        dy = global_pos.y() - y
+        left, top, right, bottom = self._RESIZE_EDGES[self.resize_dir]
+        if left:
+            x, w = x + dx, w - dx
+        elif right:
+            w = dx
+        if top:
+            y, h = y + dy, h - dy
+        elif bottom:
+            h = dy
+        if w >= self.minimumWidth() and h >= self.minimumHeight():
+            self.setGeometry(x, y, w, h)
+
+    def _apply_text_style(self, text_color=None, text_size=None, font_family=None):
+        """Set the text font and color, rebuilding the stylesheet only when they change"""
         if text_color is None:
             text_color = self.settings.get('note_text_color', NOTE_TEXT_COLOR)
         if text_size is None:
             text_size = self.settings.get('note_text_size', NOTE_TEXT_SIZE)
         if font_family is None:
             font_family = self.settings.get('note_font_family', NOTE_FONT_FAMILY)
-        self.setStyleSheet(f"background: {color}; border: 1px solid #e0e0a0;")
+        if (text_color, text_size, font_family) == self._text_style:
+            return  # Unchanged, skip re-parsing the stylesheet
+        self._text_style = (text_color, text_size, font_family)
+        # Kept in the stylesheet: a palette set on a styled widget is reset when it is repolished
         self.text_edit.setStyleSheet(f"background: transparent; border: none; font-size: {text_size}px; color: {text_color}; font-family: '{font_family}';")
-        self._update_button_colors(color)
+
+    def update_note_color(self, color=None, text_color=None, text_size=None, font_family=None):
+        """Update the note background, text color, text size, and font dynamically and update button colors."""
+        if color is None:
+            color = self.settings.get('note_color', NOTE_BG_COLOR)
+        # Stylesheets are re-parsed and re-polished on every set, so only rebuild them for a new color
+        if color != self._note_color:
+            self._note_color = color
+            self.setStyleSheet(f"background: {color}; border: 1px solid #e0e0a0;")
+            self._update_button_colors(color)
+        self._apply_text_style(text_color, text_size, font_family)
 
     def _update_button_colors(self, base_color):
         """Update the close, add, and pin button background colors to match the note color."""
-        def adjust_color(hex_color, factor):
-            # Simple lighten/darken by factor (0.0-1.0 darken, >1.0 lighten)
-            hex_color = hex_color.lstrip('#')
-            r = int(hex_color[0:2], 16)
-            g = int(hex_color[2:4], 16)
-            b = int(hex_color[4:6], 16)
-            r = min(255, max(0, int(r * factor)))
-            g = min(255, max(0, int(g * factor)))
-            b = min(255, max(0, int(b * factor)))
-            return f'#{r:02X}{g:02X}{b:02X}'
         # Use slightly different shades for each button
-        close_bg = adjust_color(base_color, 0.95)  # Slightly darker
-        add_bg = adjust_color(base_color, 1.08)    # Slightly lighter
-        pin_bg = adjust_color(base_color, 1.15)    # Even lighter
+        close_bg, add_bg, pin_bg = button_shades(base_color)
         self.close_btn.setStyleSheet(f"QPushButton {{ background: {close_bg}; border: none; font-weight: bold; color: black; }} QPushButton:hover {{ background: #ffaaaa; }}")
         self.add_btn.setStyleSheet(f"QPushButton {{ background: {add_bg}; border: none; font-weight: bold; color: black; }} QPushButton:hover {{ background: #aaffaa; }}")
         if self.pinned:
@@ -706,8 +948,76 @@ class StickyNote(QWidget):
         else:
             self.pin_btn.setStyleSheet(f"QPushButton {{ background: {pin_bg}; border: none; font-weight: bold; color: black; }} QPushButton:hover {{ background: #f0f0b0; }}")
 
+# Global hotkey registration (Windows)
+MOD_ALT = 0x0001
+MOD_CONTROL = 0x0002
+MOD_SHIFT = 0x0004
+MOD_NOREPEAT = 0x4000  # Holding the chord fires once instead of on every key autorepeat
+WM_HOTKEY = 0x0312
+WM_QUIT = 0x0012
+HOTKEY_MODIFIERS = {'ctrl': MOD_CONTROL, 'shift': MOD_SHIFT, 'alt': MOD_ALT}
+
+@functools.lru_cache(maxsize=8)
+def parse_hotkey(hotkey):
+    """Parse 'ctrl+shift+s' into (MOD_* mask, key character or None)"""
+    modifiers = 0
+    key = None
+    for part in hotkey.lower().split('+'):
+        part = part.strip()
+        if part in HOTKEY_MODIFIERS:
+            modifiers |= HOTKEY_MODIFIERS[part]
+        elif len(part) == 1:
+            key = part
+    return modifiers, key
+
+class GlobalHotkey(threading.Thread):
+    """Registers a system-wide hotkey with RegisterHotKey and calls callback when it fires.
+
+    Windows posts a single WM_HOTKEY to this thread only when the exact chord is
+    pressed, so unlike a keyboard hook no Python code runs for ordinary keystrokes.
+    """
+    HOTKEY_ID = 1
+
+    def __init__(self, modifiers, vk, callback):
+        super().__init__(daemon=True)
+        self.modifiers = modifiers
+        self.vk = vk
+        self.callback = callback
+        self.thread_id = None
+        self.ready = threading.Event()
+
+    def run(self):
+        import ctypes
+        from ctypes import wintypes
+        user32 = ctypes.windll.user32
+        self.thread_id = ctypes.windll.kernel32.GetCurrentThreadId()
+        # Hotkeys registered with no window are posted to the registering thread's queue
+        registered = user32.RegisterHotKey(None, self.HOTKEY_ID, self.modifiers, self.vk)
+        self.ready.set()
+        if not registered:
+            print(f"Could not register global hotkey (error {ctypes.GetLastError()})")
+            return
+        try:
+            msg = wintypes.MSG()
+            while user32.GetMessageW(ctypes.byref(msg), None, 0, 0) > 0:
+                if msg.message == WM_HOTKEY:
+                    self.callback()
+        finally:
+            user32.UnregisterHotKey(None, self.HOTKEY_ID)
+
+    def stop(self):
+        """Unregister the hotkey and wait for the thread, so the chord can be registered again"""
+        import ctypes
+        self.ready.wait()
+        if self.is_alive():
+            ctypes.windll.user32.PostThreadMessageW(self.thread_id, WM_QUIT, 0, 0)
+        self.join()
+
 # Main Application Class
 class StickyNotesApp(QApplication):
+    hotkey_pressed = pyqtSignal()
+    save_failed = pyqtSignal()  # Emitted by the save worker; handled on the UI thread
+
     def __init__(self, argv):
         super().__init__(argv)
         self.setQuitOnLastWindowClosed(False)
@@ -716,6 +1026,7 @@ class StickyNotesApp(QApplication):
         cleanup_old_settings()
         
         self.settings = load_settings()
+        self._refresh_settings_cache()
         
         # Hide terminal window if setting is enabled
         if self.settings.get('hide_terminal', True):
@@ -733,136 +1044,199 @@ class StickyNotesApp(QApplication):
                 sys.exit(0)
         
         self.notes = []
+        self._notes_changed = False  # Notes added/removed or settings changed since the last save
         self.tray_icon = None
+        self._settings_dlg = None  # Built on first use by show_settings
+        self._last_tray_key = None  # (theme, show_text) of the icon currently in the tray
         self.hotkey_listener = None
+        self._hotkey_chord = None  # (modifiers, key) registered by hotkey_listener
         self.oled_icon_text_visible = False
-        self.oled_icon_timer = None
+        # One timer hides the OLED icon text; start() restarts it on each activation
+        self.oled_icon_timer = QTimer()
+        self.oled_icon_timer.setSingleShot(True)
+        self.oled_icon_timer.timeout.connect(self._hide_oled_text)
         # Show OLED icon text for 15 seconds on launch if OLED theme is active
-        if self.settings.get('tray_icon_theme', 'default') == 'oled':
+        if self.settings.get('tray_icon_theme', 'default') in _NEEDS_TEXT_GATING:
             self.oled_icon_text_visible = True
-            # Start a timer to hide text after 15 seconds
-            from PyQt6.QtCore import QTimer
-            self.oled_icon_timer = QTimer()
-            self.oled_icon_timer.setSingleShot(True)
-            def hide_text():
-                self.oled_icon_text_visible = False
-                self.update_tray_icon()
-            self.oled_icon_timer.timeout.connect(hide_text)
             self.oled_icon_timer.start(15000)
         self._init_tray()
+        self.hotkey_pressed.connect(self.create_note)
         self._init_hotkey()
         
+        # Single debounced auto-save timer shared by all notes
+        self.save_timer = QTimer()
+        self.save_timer.setSingleShot(True)
+        self.save_timer.timeout.connect(self._save_notes)
+        # One worker thread, so background saves reach the disk in the order they were made
+        self.save_pool = QThreadPool()
+        self.save_pool.setMaxThreadCount(1)
+        # Newest snapshot not yet picked up by the worker; later saves replace it instead of queueing
+        self._pending_save = None
+        self._pending_save_lock = threading.Lock()
+        self._save_error = None  # Error from a failed background save, guarded by _pending_save_lock
+        self.save_failed.connect(self._take_save_error)
+        self._saves_suspended = False  # Set while the settings dialog may rewrite the notes file
+        # Flush anything still pending however the app ends up quitting
+        self.aboutToQuit.connect(self._flush_notes)
+        
         # Setup periodic cleanup timer
-        from PyQt6.QtCore import QTimer
         self.cleanup_timer = QTimer()
         self.cleanup_timer.timeout.connect(self._cleanup_memory)
         self.cleanup_timer.start(CLEANUP_INTERVAL)
         
+        # Whether the open notes were decrypted from the notes file at startup
+        self._notes_were_encrypted = False
         # Load saved notes if reopen_notes is enabled
-        if self.settings.get('reopen_notes', False):
+        if self._reopen_enabled:
             self._load_saved_notes()
         else:
             # Create a default note if no notes to reopen
             self.create_note()
 
-    def create_note(self, text="", geometry=None, pinned=False):
+    def _refresh_settings_cache(self):
+        """Cache settings read on hot paths (auto-save); call whenever self.settings changes"""
+        self._reopen_enabled = self.settings.get('reopen_notes', False)
+
+    def create_note(self, text="", geometry=None, pinned=False, skip_overlap=False):
         note = StickyNote(self, self.settings, str(text), geometry, pinned)
         
         # Check for overlapping notes and reposition if needed
-        self._avoid_overlap(note)
+        if not skip_overlap:
+            self._avoid_overlap(note)
         
         note.show()
         self.notes.append(note)
+        self._notes_changed = True
         return note
 
     def _load_saved_notes(self):
         """Load saved notes from file"""
-        saved_notes = load_notes(self.settings)
+        saved_notes, self._notes_were_encrypted = load_notes(self.settings)
         if saved_notes:
             for note_data in saved_notes:
                 self.create_note(
                     text=note_data.get('text', ''),
-                    geometry=note_data.get('geometry'),
-                    pinned=note_data.get('pinned', False)  # Load pin state
+                    geometry=note_data.get('g', note_data.get('geometry')),
+                    pinned=note_data.get('pinned', False),  # Load pin state
+                    skip_overlap=True  # Restore saved positions as the user left them
                 )
         else:
             # Create a default note if no saved notes
             self.create_note()
 
+    def schedule_save(self):
+        """Save notes once no further change arrives for AUTO_SAVE_DELAY milliseconds"""
+        self.save_timer.start(AUTO_SAVE_DELAY)
+
     def _save_notes(self):
-        """Save current notes to file"""
-        if self.settings.get('reopen_notes', False):
-            save_notes(self.notes, self.settings)
+        """Save current notes to file, skipping the write if nothing changed"""
+        if not self._reopen_enabled or self._saves_suspended:
+            return  # Changes stay flagged and are saved later
+        if not self._notes_changed and not any(note._dirty for note in self.notes):
+            return
+        # Snapshot on the UI thread; encryption and file I/O happen on the save worker
+        pending = (snapshot_notes(self.notes), dict(self.settings))  # Copy, settings may change meanwhile
+        with self._pending_save_lock:
+            queued = self._pending_save is not None
+            self._pending_save = pending
+        if not queued:
+            self.save_pool.start(SaveNotesTask(self._take_pending_save, self._report_save_error))
+        self._notes_changed = False
+        for note in self.notes:
+            note._dirty = False
+
+    def _take_pending_save(self):
+        """Hand the newest snapshot to the save worker (runs on the worker thread)"""
+        with self._pending_save_lock:
+            pending, self._pending_save = self._pending_save, None
+        return pending
+
+    def _report_save_error(self, error):
+        """Record a failed background save (runs on the worker thread)"""
+        with self._pending_save_lock:
+            self._save_error = error
+        self.save_failed.emit()
+
+    def _take_save_error(self):
+        """Mark the notes unsaved again after a failed write and tell the user; True if one failed"""
+        with self._pending_save_lock:
+            error, self._save_error = self._save_error, None
+        if error is None:
+            return False
+        # The dirty flags were cleared when the save was queued, so the next save must rewrite everything
+        self._notes_changed = True
+        if self.tray_icon is not None:
+            self.tray_icon.showMessage(APP_NAME, f"Could not save notes: {error}",
+                                       QSystemTrayIcon.MessageIcon.Warning)
+        return True
+
+    def _flush_notes(self):
+        """Write pending changes now and wait for the write to reach disk"""
+        self.save_timer.stop()
+        self._save_notes()
+        self.save_pool.waitForDone()
+        # save_failed is queued and won't be delivered before quitting, so check directly and retry once
+        if self._take_save_error():
+            self._save_notes()
+            self.save_pool.waitForDone()
+            self._take_save_error()
 
     def _cleanup_memory(self):
         """Periodic memory cleanup to reduce resource usage"""
-        import gc
-        
-        # Remove deleted notes from the list
-        self.notes = [note for note in self.notes if not getattr(note, 'is_deleted', False)]
-        
-        # Force garbage collection
-        gc.collect()
+        # Remove deleted notes from the list; closed notes are freed by deleteLater/refcounting,
+        # so no forced gc.collect() pass is needed
+        # Notes are normally removed as they close, so usually there's nothing to rebuild
+        if any(note.is_deleted for note in self.notes):
+            # Compact in place, keeping the same list object
+            kept = 0
+            for note in self.notes:
+                if not note.is_deleted:
+                    self.notes[kept] = note
+                    kept += 1
+            del self.notes[kept:]
         
         # Limit number of notes in memory
         if len(self.notes) > MAX_NOTES_TO_SAVE:
             # Remove oldest notes (keep the most recent ones)
             notes_to_remove = len(self.notes) - MAX_NOTES_TO_SAVE
-            for _ in range(notes_to_remove):
-                if self.notes:
-                    oldest_note = self.notes.pop(0)
-                    oldest_note.close()
-                    oldest_note.deleteLater()
+            self._notes_changed = True
+            # Drop them with one slice instead of repeated pop(0), which shifts the list each time
+            oldest_notes = self.notes[:notes_to_remove]
+            del self.notes[:notes_to_remove]
+            for oldest_note in oldest_notes:
+                oldest_note.close()
+                oldest_note.deleteLater()
 
     def _avoid_overlap(self, new_note):
         """Reposition new note to avoid overlapping with existing notes"""
         if not self.notes:
             return  # No existing notes to check against
         
-        new_rect = new_note.geometry()
-        offset = new_rect.width() + 20  # Full note width plus 20px gap
+        # Snapshot existing notes once as (left, top, right, bottom) tuples
+        rects = [(x, y, x + w, y + h) for x, y, w, h in (note.geometry_tuple() for note in self.notes)]
         
-        for existing_note in self.notes:
-            existing_rect = existing_note.geometry()
-            
-            # Check if notes overlap
-            if (new_rect.x() < existing_rect.x() + existing_rect.width() and
-                new_rect.x() + new_rect.width() > existing_rect.x() and
-                new_rect.y() < existing_rect.y() + existing_rect.height() and
-                new_rect.y() + new_rect.height() > existing_rect.y()):
-                
-                # Try moving right first
-                new_pos = new_rect.topLeft() + QPoint(offset, 0)
-                new_rect.moveTopLeft(new_pos)
-                
-                # Check if moving right still causes overlap
-                still_overlapping = False
-                for other_note in self.notes:
-                    other_rect = other_note.geometry()
-                    if (new_rect.x() < other_rect.x() + other_rect.width() and
-                        new_rect.x() + new_rect.width() > other_rect.x() and
-                        new_rect.y() < other_rect.y() + other_rect.height() and
-                        new_rect.y() + new_rect.height() > other_rect.y()):
-                        still_overlapping = True
-                        break
-                
-                # If still overlapping, try moving left instead
-                if still_overlapping:
-                    new_pos = new_rect.topLeft() - QPoint(offset * 2, 0)  # Move back and then left
-                    new_rect.moveTopLeft(new_pos)
-                
-                # Update the note position
-                new_note.setGeometry(new_rect)
-                break
+        def overlaps(x, y, w, h):
+            return any(x < right and x + w > left and y < bottom and y + h > top
+                       for left, top, right, bottom in rects)
+        
+        x, y, w, h = new_note.geometry_tuple()
+        if not overlaps(x, y, w, h):
+            return
+        
+        offset = w + 20  # Full note width plus 20px gap
+        # Try moving right first
+        x += offset
+        # If still overlapping, try moving left instead
+        if overlaps(x, y, w, h):
+            x -= offset * 2  # Move back and then left
+        
+        # Update the note position
+        new_note.setGeometry(x, y, w, h)
 
     def _init_tray(self):
         # Create a simple icon for the tray
-        theme = self.settings.get('tray_icon_theme', 'default')
-        show_text = True
-        if theme == 'oled' and not getattr(self, 'oled_icon_text_visible', False):
-            show_text = False
-        icon = get_tray_icon(theme, show_text)
-        self.tray_icon = QSystemTrayIcon(icon)
+        self._last_tray_key = self._current_tray_args()
+        self.tray_icon = QSystemTrayIcon(get_tray_icon(*self._last_tray_key))
         self.tray_icon.setToolTip(APP_NAME)
         
         # Create tray menu
@@ -911,30 +1285,39 @@ class StickyNotesApp(QApplication):
         if reason == QSystemTrayIcon.ActivationReason.DoubleClick:
             self.create_note()
         # OLED icon: show text on any activation, then hide after 2 seconds
-        theme = self.settings.get('tray_icon_theme', 'default')
-        if theme == 'oled':
+        if self.settings.get('tray_icon_theme', 'default') in _NEEDS_TEXT_GATING:
             self.oled_icon_text_visible = True
             self.update_tray_icon()
-            from PyQt6.QtCore import QTimer
-            if self.oled_icon_timer:
-                self.oled_icon_timer.stop()
-            self.oled_icon_timer = QTimer()
-            self.oled_icon_timer.setSingleShot(True)
-            def hide_text():
-                self.oled_icon_text_visible = False
-                self.update_tray_icon()
-            self.oled_icon_timer.timeout.connect(hide_text)
             self.oled_icon_timer.start(2000)
 
+    def _hide_oled_text(self):
+        self.oled_icon_text_visible = False
+        self.update_tray_icon()
+
     def show_settings(self):
-        dlg = SettingsDialog(self.settings)
+        # Build the dialog once (the font combo enumerates every system font); reopening just refreshes it
+        if self._settings_dlg is None:
+            self._settings_dlg = SettingsDialog(self.settings)
+        else:
+            self._settings_dlg.refresh(self.settings)
+        dlg = self._settings_dlg
         
         # Set the dialog to always be on top if the setting is enabled
-        if self.settings['always_on_top']:
-            dlg.setWindowFlag(Qt.WindowType.WindowStaysOnTopHint, True)
-            dlg.show()  # Need to show after setting the flag
+        if bool(dlg.windowFlags() & Qt.WindowType.WindowStaysOnTopHint) != self.settings['always_on_top']:
+            dlg.setWindowFlag(Qt.WindowType.WindowStaysOnTopHint, self.settings['always_on_top'])
         
-        if dlg.exec():
+        # Removing the password in the dialog decrypts the notes file and then deletes the
+        # credential; an auto-save in between would re-encrypt the file with the deleted
+        # password, so write pending changes now and hold further saves until it closes
+        self._flush_notes()
+        self._saves_suspended = True
+        try:
+            accepted = dlg.exec()
+        finally:
+            self._saves_suspended = False
+        self.schedule_save()  # Save anything held back while the dialog was open
+        
+        if accepted:
             new_settings = dlg.get_settings()
             
             # Check if encryption is being disabled
@@ -943,71 +1326,60 @@ class StickyNotesApp(QApplication):
             
             # If encryption is being disabled, decrypt and resave notes
             if encryption_disabled:
-                if not self._decrypt_and_resave_notes():
+                self.save_timer.stop()
+                self.save_pool.waitForDone()  # Let pending encrypted saves land first
+                if self._reopen_enabled and self._notes_were_encrypted:
+                    # The open notes were decrypted from the file, so write them out in plain
+                    # text directly instead of reading and decrypting the file again. If the
+                    # file could not be decrypted at startup the open notes are not its
+                    # contents, and overwriting it would lose them.
+                    decrypted, message = self._write_notes_plain()
+                else:
+                    decrypted, message = decrypt_and_resave_notes()
+                if not decrypted:
                     QMessageBox.warning(None, "Decryption Failed", 
-                                      "Failed to decrypt notes. Encryption will remain enabled.")
+                                      f"{message}\nEncryption will remain enabled.")
                     return  # Don't save settings if decryption failed
+                if message and self.tray_icon is not None:
+                    # Success needs no acknowledgement, so don't block on a modal box
+                    self.tray_icon.showMessage("StickyPosts", message)
             
             self.settings.update(new_settings)
+            self._refresh_settings_cache()
             save_settings(self.settings)
+            self._notes_changed = True  # Encryption/reopen changes must reach the notes file
+            self.schedule_save()
             set_startup(self.settings['launch_on_startup'])
             self.update_tray_icon() # Update tray icon after settings change
             # Update all notes' always-on-top (consider individual pin states)
+            always_on_top = self.settings['always_on_top']
+            note_style = (
+                self.settings.get('note_color', NOTE_BG_COLOR),
+                self.settings.get('note_text_color', NOTE_TEXT_COLOR),
+                self.settings.get('note_text_size', NOTE_TEXT_SIZE),
+                self.settings.get('note_font_family', NOTE_FONT_FAMILY),
+            )
             for note in self.notes:
-                note.setWindowFlag(Qt.WindowType.WindowStaysOnTopHint, self.settings['always_on_top'] or getattr(note, 'pinned', False))
-                note.update_note_color(
-                    self.settings.get('note_color', NOTE_BG_COLOR),
-                    self.settings.get('note_text_color', NOTE_TEXT_COLOR),
-                    self.settings.get('note_text_size', NOTE_TEXT_SIZE),
-                    self.settings.get('note_font_family', NOTE_FONT_FAMILY)
-                )
-                note.show()  # Needed to apply flag
+                on_top = always_on_top or note.pinned
+                # Changing window flags recreates the native window, so only do it when the state changes
+                if bool(note.windowFlags() & Qt.WindowType.WindowStaysOnTopHint) != on_top:
+                    note.setWindowFlag(Qt.WindowType.WindowStaysOnTopHint, on_top)
+                    note.show()  # Needed to apply flag
+                note.update_note_color(*note_style)
             self._init_hotkey()
 
-    def _decrypt_and_resave_notes(self):
-        """Decrypt notes and save them in plain text format"""
+    def _write_notes_plain(self):
+        """Write the open notes unencrypted, replacing an encrypted notes file; returns (ok, message)"""
         try:
-            if not os.path.exists(NOTES_FILE):
-                return True  # No file to decrypt
-            
-            # Load notes to check if they're actually encrypted
-            with open(NOTES_FILE, 'r') as f:
-                data = json.load(f)
-            
-            # Check if data is encrypted
-            if isinstance(data, dict) and 'salt' in data and 'data' in data:
-                # Data is encrypted, so we need a password
-                password = get_password_from_credential_manager()
-                if not password:
-                    QMessageBox.warning(None, "No Password", 
-                                      "No encryption password found. Cannot decrypt notes.")
-                    return False
-                
-                decrypted_data = decrypt_data(data, password)
-                if decrypted_data is None:
-                    QMessageBox.warning(None, "Decryption Failed", 
-                                      "Failed to decrypt notes with current password.")
-                    return False
-                
-                # Save decrypted data in plain text format
-                with open(NOTES_FILE, 'w') as f:
-                    json.dump(decrypted_data, f, indent=2)
-                
-                QMessageBox.information(None, "Decryption Complete", 
-                                      "Notes have been decrypted and saved in plain text format.")
-                return True
-            else:
-                # Data is already not encrypted, nothing to do
-                return True
-                
-        except Exception as e:
-            QMessageBox.warning(None, "Decryption Error", 
-                              f"Error during decryption: {str(e)}")
-            return False
+            with _notes_file_lock:
+                write_notes(snapshot_notes(self.notes), {'encrypt_notes': False})
+        except OSError as e:
+            return False, f"Could not save notes: {str(e)}"
+        return True, "Notes have been saved in plain text format."
 
     def exit_app(self):
-        # Save notes before exiting
-        self._save_notes()
+        # Save notes before exiting and wait for the write to finish
+        self._flush_notes()
         if self.tray_icon is not None:
             self.tray_icon.hide()
         for note in self.notes:
@@ -1015,83 +1387,59 @@ class StickyNotesApp(QApplication):
         self.quit()
 
     def _init_hotkey(self):
-        if hasattr(self, 'hotkey_listener') and self.hotkey_listener:
-            self.hotkey_listener.stop()
+        import ctypes
+        hotkey = self.settings.get('hotkey', 'ctrl+shift+s')
+        # Convert to Win32 form: ctrl+shift+s -> MOD_CONTROL | MOD_SHIFT plus the virtual-key code of 's'
+        modifiers, key = parse_hotkey(hotkey)
+        if (modifiers, key) == self._hotkey_chord and self.hotkey_listener and self.hotkey_listener.is_alive():
+            return  # Unchanged and still registered, keep the running listener
 
-        hotkey = self.settings.get('hotkey', 'ctrl+shift+s').lower()
-        # Convert to pynput format: ctrl+shift+s -> <ctrl>+<shift>+s
-        parts = []
-        for part in hotkey.split('+'):
-            part = part.strip()
-            if part == 'ctrl':
-                parts.append('<ctrl>')
-            elif part == 'shift':
-                parts.append('<shift>')
-            elif part == 'alt':
-                parts.append('<alt>')
-            else:
-                parts.append(part)
-        hotkey_str = '+'.join(parts)
+        if self.hotkey_listener:
+            self.hotkey_listener.stop()
+            self.hotkey_listener = None
+            self._hotkey_chord = None
 
-        def on_activate():
-            from PyQt6.QtCore import QTimer
-            QTimer.singleShot(0, self.create_note)
+        if key is None:
+            print(f"Invalid hotkey: {hotkey}")
+            return
+        vk = ctypes.windll.user32.VkKeyScanW(ord(key)) & 0xFF
 
-        from pynput import keyboard
-        self.hotkey_listener = keyboard.GlobalHotKeys({
-            hotkey_str: on_activate
-        })
+        # The listener thread emits hotkey_pressed; Qt queues it to create_note on the UI thread
+        self.hotkey_listener = GlobalHotkey(modifiers | MOD_NOREPEAT, vk, self.hotkey_pressed.emit)
         self.hotkey_listener.start()
+        self._hotkey_chord = (modifiers, key)
 
     def _confirm_delete_all_notes(self):
-        from PyQt6.QtWidgets import QDialog, QVBoxLayout, QLabel, QLineEdit, QPushButton, QHBoxLayout
-        dialog = QDialog()
+        # A stock input dialog is enough here; an instance (not getText) so it can stay on top
+        dialog = QInputDialog()
         dialog.setWindowTitle("Delete All Notes")
         dialog.setWindowFlag(Qt.WindowType.WindowStaysOnTopHint, True)
-        layout = QVBoxLayout(dialog)
-        label = QLabel("Type DELETE to confirm you want to close all open notes. This cannot be undone.")
-        layout.addWidget(label)
-        input_box = QLineEdit()
-        layout.addWidget(input_box)
-        btn_layout = QHBoxLayout()
-        delete_btn = QPushButton("Delete")
-        delete_btn.setEnabled(False)
-        cancel_btn = QPushButton("Cancel")
-        btn_layout.addWidget(delete_btn)
-        btn_layout.addWidget(cancel_btn)
-        layout.addLayout(btn_layout)
-        def on_text_changed(text):
-            delete_btn.setEnabled(text == "DELETE")
-        input_box.textChanged.connect(on_text_changed)
-        def on_delete():
-            dialog.accept()
-        def on_cancel():
-            dialog.reject()
-        delete_btn.clicked.connect(on_delete)
-        cancel_btn.clicked.connect(on_cancel)
-        dialog.setLayout(layout)
-        result = dialog.exec()
-        if result == QDialog.DialogCode.Accepted:
+        dialog.setLabelText("Type DELETE to confirm you want to close all open notes. This cannot be undone.")
+        dialog.setOkButtonText("Delete")
+        if dialog.exec() and dialog.textValue() == "DELETE":
             self._delete_all_notes()
 
     def _delete_all_notes(self):
         # Close all notes and clear the list
-        for note in self.notes[:]:
+        for note in self.notes:
             note.is_deleted = True
             note.close()
         self.notes.clear()
-        # Save notes to persist deletion if needed
-        if self.settings.get('reopen_notes', False):
-            self._save_notes()
+        self._notes_changed = True
+        self.schedule_save()
+
+    def _current_tray_args(self):
+        """(theme, show_text) for the tray icon that should be showing now"""
+        theme = self.settings.get('tray_icon_theme', 'default')
+        return theme, theme not in _NEEDS_TEXT_GATING or self.oled_icon_text_visible
 
     def update_tray_icon(self):
         if self.tray_icon:
-            theme = self.settings.get('tray_icon_theme', 'default')
-            show_text = True
-            if theme == 'oled' and not getattr(self, 'oled_icon_text_visible', False):
-                show_text = False
-            icon = get_tray_icon(theme, show_text)
-            self.tray_icon.setIcon(icon)
+            key = self._current_tray_args()
+            if key == self._last_tray_key:
+                return  # Already showing this icon
+            self._last_tray_key = key
+            self.tray_icon.setIcon(get_tray_icon(*key))
 
 # Custom Hotkey Input Widget
 class HotkeyInput(QLineEdit):
@@ -1099,50 +1447,17 @@ class HotkeyInput(QLineEdit):
         super().__init__(parent)
         self.setMaxLength(1)  # Only allow one character
         self.setPlaceholderText("Press a key...")
-        self.hotkey_listener = None
         self.current_hotkey = ""
-        self.recording = False
-        
-    def focusInEvent(self, event):
-        super().focusInEvent(event)
-        self.start_recording()
-        
-    def focusOutEvent(self, event):
-        super().focusOutEvent(event)
-        self.stop_recording()
-        
-    def start_recording(self):
-        if self.recording:
-            return
-        self.recording = True
-        self.setText("")
-        
-        def on_press(key):
-            if not self.recording:
-                return
-            # Handle character keys (letters and numbers only)
-            if hasattr(key, 'char') and key.char and key.char.isprintable():
-                char_key = key.char.lower()
-                if char_key.isalnum():  # Only letters and numbers
-                    self.setText(char_key)
-                    self.current_hotkey = char_key
-                    self.stop_recording()
-                    return
-
-        def on_release(key):
-            pass  # We don't need to handle releases for single key detection
 
-        if self.hotkey_listener:
-            self.hotkey_listener.stop()
-            self.hotkey_listener = None
-        self.hotkey_listener = keyboard.Listener(on_press=on_press, on_release=on_release)
-        self.hotkey_listener.start()
-        
-    def stop_recording(self):
-        if self.hotkey_listener:
-            self.hotkey_listener.stop()
-            self.hotkey_listener = None
-        self.recording = False
+    def keyPressEvent(self, event):
+        # Record letters and numbers only; other keys propagate so Esc/Enter still reach the dialog
+        char_key = event.text().lower()
+        if len(char_key) == 1 and char_key.isalnum():
+            self.setText(char_key)
+            self.current_hotkey = char_key
+            self.clearFocus()
+        else:
+            event.ignore()
 
     def get_hotkey(self):
         return self.current_hotkey
@@ -1161,19 +1476,15 @@ class SettingsDialog(QDialog):
         general_layout.setContentsMargins(20, 20, 20, 20)
         # Launch on startup
         self.startup_cb = QCheckBox('Launch on system startup')
-        self.startup_cb.setChecked(settings['launch_on_startup'])
         general_layout.addWidget(self.startup_cb)
         # Always on top
         self.ontop_cb = QCheckBox('Always on top for all notes')
-        self.ontop_cb.setChecked(settings['always_on_top'])
         general_layout.addWidget(self.ontop_cb)
         # Reopen notes
         self.reopen_cb = QCheckBox('Reopen notes on startup')
-        self.reopen_cb.setChecked(settings['reopen_notes'])
         general_layout.addWidget(self.reopen_cb)
         # Hide terminal window
         self.hide_terminal_cb = QCheckBox('Hide terminal window on launch')
-        self.hide_terminal_cb.setChecked(settings.get('hide_terminal', True))
         general_layout.addWidget(self.hide_terminal_cb)
         # Tray icon theme
         icon_theme_label = QLabel('System tray icon theme:')
@@ -1186,13 +1497,6 @@ class SettingsDialog(QDialog):
             'OLED Safe',
             'Monochrome',
         ])
-        theme_map = {
-            'default': 0,
-            'dark': 1,
-            'oled': 2,
-            'monochrome': 3,
-        }
-        self.icon_theme_combo.setCurrentIndex(theme_map.get(settings.get('tray_icon_theme', 'default'), 0))
         general_layout.addWidget(self.icon_theme_combo)
         # Hotkey section
         general_layout.addSpacing(10)
@@ -1202,13 +1506,6 @@ class SettingsDialog(QDialog):
         self.ctrl_cb = QCheckBox('Ctrl')
         self.shift_cb = QCheckBox('Shift')
         self.alt_cb = QCheckBox('Alt')
-        hotkey = settings.get('hotkey', 'ctrl+shift+s').lower()
-        if 'ctrl' in hotkey:
-            self.ctrl_cb.setChecked(True)
-        if 'shift' in hotkey:
-            self.shift_cb.setChecked(True)
-        if 'alt' in hotkey:
-            self.alt_cb.setChecked(True)
         modifier_layout.addWidget(self.ctrl_cb)
         modifier_layout.addWidget(self.shift_cb)
         modifier_layout.addWidget(self.alt_cb)
@@ -1218,12 +1515,6 @@ class SettingsDialog(QDialog):
         key_label = QLabel('Key:')
         self.hotkey_edit = HotkeyInput()
         self.hotkey_edit.setFixedHeight(20)
-        key_parts = hotkey.split('+')
-        for part in key_parts:
-            if part not in ['ctrl', 'shift', 'alt'] and len(part) == 1:
-                self.hotkey_edit.setText(part)
-                self.hotkey_edit.current_hotkey = part
-                break
         key_layout.addWidget(key_label)
         key_layout.addWidget(self.hotkey_edit)
         general_layout.addLayout(key_layout)
@@ -1236,7 +1527,6 @@ class SettingsDialog(QDialog):
         encryption_layout.setContentsMargins(20, 20, 20, 20)
         # Encryption settings
         self.encrypt_cb = QCheckBox('Encrypt notes')
-        self.encrypt_cb.setChecked(settings['encrypt_notes'])
         self.encrypt_cb.toggled.connect(self._on_encryption_toggled)
         encryption_layout.addWidget(self.encrypt_cb)
         # Encryption password management
@@ -1246,14 +1536,10 @@ class SettingsDialog(QDialog):
         self.password_btn.clicked.connect(self._set_encryption_password)
         password_layout.addWidget(self.password_btn)
         self.password_status = QLabel('No password set')
-        if get_password_from_credential_manager():
-            self.password_status.setText('Password is set')
         password_layout.addWidget(self.password_status)
         encryption_layout.addLayout(password_layout)
         encryption_layout.addSpacing(5)
         self.startup_prompt_cb = QCheckBox('Prompt for password on startup')
-        self.startup_prompt_cb.setChecked(settings['prompt_password_on_startup'])
-        self.startup_prompt_cb.setEnabled(settings['encrypt_notes'])
         encryption_layout.addWidget(self.startup_prompt_cb)
         encryption_layout.addStretch()
         # Theme tab (was Colors)
@@ -1276,27 +1562,15 @@ class SettingsDialog(QDialog):
         ]
         for name, _ in self.color_options:
             self.color_combo.addItem(name)
-        # Set current index based on settings
-        current_color = settings.get('note_color', NOTE_BG_COLOR)
-        idx = next((i for i, (_, c) in enumerate(self.color_options[:-1]) if c and c.lower() == current_color.lower()), None)
-        if idx is not None:
-            self.color_combo.setCurrentIndex(idx)
-            self.selected_color = self.color_options[idx][1]
-        else:
-            # Not a preset, treat as custom
-            self.color_combo.setCurrentIndex(len(self.color_options) - 1)
-            self.selected_color = current_color
         theme_layout.addWidget(self.color_combo)
         self.custom_color_btn = QPushButton('Choose Custom Color')
         self.custom_color_btn.setFixedHeight(30)
         theme_layout.addWidget(self.custom_color_btn)
-        self.selected_color = current_color
         def on_color_combo_changed(index):
             if self.color_options[index][1] is not None:
                 self.selected_color = self.color_options[index][1]
             else:
                 # Open color dialog
-                from PyQt6.QtWidgets import QColorDialog
                 color_dialog = QColorDialog(self)
                 color_dialog.setWindowFlag(Qt.WindowType.WindowStaysOnTopHint, True)
                 if color_dialog.exec():
@@ -1309,7 +1583,6 @@ class SettingsDialog(QDialog):
                 self.selected_color = self.color_options[0][1]
         self.color_combo.currentIndexChanged.connect(on_color_combo_changed)
         def on_custom_color_btn():
-            from PyQt6.QtWidgets import QColorDialog
             color_dialog = QColorDialog(self)
             color_dialog.setWindowFlag(Qt.WindowType.WindowStaysOnTopHint, True)
             if color_dialog.exec():
@@ -1333,24 +1606,14 @@ class SettingsDialog(QDialog):
         ]
         for name, _ in self.text_color_options:
             self.text_color_combo.addItem(name)
-        current_text_color = settings.get('note_text_color', NOTE_TEXT_COLOR)
-        idx = next((i for i, (_, c) in enumerate(self.text_color_options[:-1]) if c and c.lower() == current_text_color.lower()), None)
-        if idx is not None:
-            self.text_color_combo.setCurrentIndex(idx)
-            self.selected_text_color = self.text_color_options[idx][1]
-        else:
-            self.text_color_combo.setCurrentIndex(len(self.text_color_options) - 1)
-            self.selected_text_color = current_text_color
         theme_layout.addWidget(self.text_color_combo)
         self.custom_text_color_btn = QPushButton('Choose Custom Text Color')
         self.custom_text_color_btn.setFixedHeight(30)
         theme_layout.addWidget(self.custom_text_color_btn)
-        self.selected_text_color = current_text_color
         def on_text_color_combo_changed(index):
             if self.text_color_options[index][1] is not None:
                 self.selected_text_color = self.text_color_options[index][1]
             else:
-                from PyQt6.QtWidgets import QColorDialog
                 color_dialog = QColorDialog(self)
                 color_dialog.setWindowFlag(Qt.WindowType.WindowStaysOnTopHint, True)
                 if color_dialog.exec():
@@ -1362,7 +1625,6 @@ class SettingsDialog(QDialog):
                 self.selected_text_color = self.text_color_options[0][1]
         self.text_color_combo.currentIndexChanged.connect(on_text_color_combo_changed)
         def on_custom_text_color_btn():
-            from PyQt6.QtWidgets import QColorDialog
             color_dialog = QColorDialog(self)
             color_dialog.setWindowFlag(Qt.WindowType.WindowStaysOnTopHint, True)
             if color_dialog.exec():
@@ -1374,10 +1636,8 @@ class SettingsDialog(QDialog):
         # --- Text size option ---
         text_size_label = QLabel('Sticky note text size:')
         theme_layout.addWidget(text_size_label)
-        from PyQt6.QtWidgets import QSpinBox, QFontComboBox
         self.text_size_spin = QSpinBox()
         self.text_size_spin.setRange(8, 48)
-        self.text_size_spin.setValue(settings.get('note_text_size', NOTE_TEXT_SIZE))
         self.text_size_spin.setSingleStep(1)
         theme_layout.addWidget(self.text_size_spin)
         # --- Font family option ---
@@ -1385,7 +1645,6 @@ class SettingsDialog(QDialog):
         theme_layout.addWidget(font_label)
         self.font_combo = QFontComboBox()
         self.font_combo.setEditable(False)
-        self.font_combo.setCurrentText(settings.get('note_font_family', NOTE_FONT_FAMILY))
         theme_layout.addWidget(self.font_combo)
         theme_layout.addStretch()
         tab_widget.addTab(general_tab, 'General')
@@ -1405,6 +1664,54 @@ class SettingsDialog(QDialog):
         btn_layout.addWidget(self.cancel_btn)
         main_layout.addLayout(btn_layout)
         self.setLayout(main_layout)
+        self.refresh(settings)
+
+    def refresh(self, settings):
+        """Show the values from settings; the widgets themselves are built once in __init__"""
+        self.settings = settings
+        self.startup_cb.setChecked(settings['launch_on_startup'])
+        self.ontop_cb.setChecked(settings['always_on_top'])
+        self.reopen_cb.setChecked(settings['reopen_notes'])
+        self.hide_terminal_cb.setChecked(settings.get('hide_terminal', True))
+        self.icon_theme_combo.setCurrentIndex(TRAY_ICON_THEME_INDEX.get(settings.get('tray_icon_theme', 'default'), 0))
+        hotkey_mods, hotkey_key = parse_hotkey(settings.get('hotkey', 'ctrl+shift+s'))
+        self.ctrl_cb.setChecked(bool(hotkey_mods & MOD_CONTROL))
+        self.shift_cb.setChecked(bool(hotkey_mods & MOD_SHIFT))
+        self.alt_cb.setChecked(bool(hotkey_mods & MOD_ALT))
+        self.hotkey_edit.setText(hotkey_key or '')
+        self.hotkey_edit.current_hotkey = hotkey_key or ''
+        # Encryption
+        self.encrypt_cb.blockSignals(True)
+        self.encrypt_cb.setChecked(settings['encrypt_notes'])
+        self.encrypt_cb.blockSignals(False)
+        if get_password_from_credential_manager():
+            self.password_status.setText('Password is set')
+        else:
+            self.password_status.setText('No password set')
+        self.startup_prompt_cb.setChecked(settings['prompt_password_on_startup'])
+        self.startup_prompt_cb.setEnabled(settings['encrypt_notes'])
+        # Theme; block the combos' signals so selecting "Custom..." doesn't open the color picker
+        current_color = settings.get('note_color', NOTE_BG_COLOR)
+        idx = next((i for i, (_, c) in enumerate(self.color_options[:-1]) if c and c.lower() == current_color.lower()), None)
+        self.color_combo.blockSignals(True)
+        if idx is not None:
+            self.color_combo.setCurrentIndex(idx)
+        else:
+            # Not a preset, treat as custom
+            self.color_combo.setCurrentIndex(len(self.color_options) - 1)
+        self.color_combo.blockSignals(False)
+        self.selected_color = current_color
+        current_text_color = settings.get('note_text_color', NOTE_TEXT_COLOR)
+        idx = next((i for i, (_, c) in enumerate(self.text_color_options[:-1]) if c and c.lower() == current_text_color.lower()), None)
+        self.text_color_combo.blockSignals(True)
+        if idx is not None:
+            self.text_color_combo.setCurrentIndex(idx)
+        else:
+            self.text_color_combo.setCurrentIndex(len(self.text_color_options) - 1)
+        self.text_color_combo.blockSignals(False)
+        self.selected_text_color = current_text_color
+        self.text_size_spin.setValue(settings.get('note_text_size', NOTE_TEXT_SIZE))
+        self.font_combo.setCurrentText(settings.get('note_font_family', NOTE_FONT_FAMILY))
 
     def _on_encryption_toggled(self, enabled):
         """Enable/disable startup prompt based on encryption setting"""
@@ -1440,14 +1747,15 @@ class SettingsDialog(QDialog):
                     )
                     if reply == QMessageBox.StandardButton.Yes:
                         # Decrypt notes before removing password
-                        if self._decrypt_and_resave_notes():
+                        decrypted, message = decrypt_and_resave_notes(self)
+                        if decrypted:
                             if delete_password_from_credential_manager():
                                 self.password_status.setText('No password set')
                                 QMessageBox.information(self, 'Success', 'Notes decrypted and password removed.')
                             else:
                                 QMessageBox.warning(self, 'Error', 'Failed to remove password from Windows Credential Manager.')
                         else:
-                            QMessageBox.warning(self, 'Decryption Failed', 'Failed to decrypt notes. Password not removed.')
+                            QMessageBox.warning(self, 'Decryption Failed', f'{message}\nPassword not removed.')
                     else:
                         return  # User cancelled
                 else:
@@ -1458,47 +1766,6 @@ class SettingsDialog(QDialog):
                     else:
                         QMessageBox.warning(self, 'Error', 'Failed to remove password from Windows Credential Manager.')
 
-    def _decrypt_and_resave_notes(self):
-        """Decrypt notes and save them in plain text format"""
-        try:
-            if not os.path.exists(NOTES_FILE):
-                return True  # No file to decrypt
-            
-            # Load notes to check if they're actually encrypted
-            with open(NOTES_FILE, 'r') as f:
-                data = json.load(f)
-            
-            # Check if data is encrypted
-            if isinstance(data, dict) and 'salt' in data and 'data' in data:
-                # Data is encrypted, so we need a password
-                password = get_password_from_credential_manager()
-                if not password:
-                    QMessageBox.warning(self, "No Password", 
-                                      "No encryption password found. Cannot decrypt notes.")
-                    return False
-                
-                decrypted_data = decrypt_data(data, password)
-                if decrypted_data is None:
-                    QMessageBox.warning(self, "Decryption Failed", 
-                                      "Failed to decrypt notes with current password.")
-                    return False
-                
-                # Save decrypted data in plain text format
-                with open(NOTES_FILE, 'w') as f:
-                    json.dump(decrypted_data, f, indent=2)
-                
-                QMessageBox.information(self, "Decryption Complete", 
-                                      "Notes have been decrypted and saved in plain text format.")
-                return True
-            else:
-                # Data is already not encrypted, nothing to do
-                return True
-                
-        except Exception as e:
-            QMessageBox.warning(self, "Decryption Error", 
-                              f"Error during decryption: {str(e)}")
-            return False
-
     def get_settings(self):
         # Build hotkey string from checkboxes and key
         modifiers = []
@@ -1514,8 +1781,7 @@ class SettingsDialog(QDialog):
             modifiers.append(key)
         
         hotkey = '+'.join(modifiers) if modifiers else 'ctrl+shift+s'
-        theme_idx = self.icon_theme_combo.currentIndex()
-        theme_val = ['default', 'dark', 'oled', 'monochrome'][theme_idx]
+        theme_val = TRAY_ICON_THEMES[self.icon_theme_combo.currentIndex()]
         result = {
             'launch_on_startup': self.startup_cb.isChecked(),
             'always_on_top': self.ontop_cb.isChecked(),
@@ -1524,8 +1790,8 @@ class SettingsDialog(QDialog):
             'encrypt_notes': self.encrypt_cb.isChecked(),
             'prompt_password_on_startup': self.startup_prompt_cb.isChecked(),
             'tray_icon_theme': theme_val,
-            'note_color': getattr(self, 'selected_color', NOTE_BG_COLOR),
-            'note_text_color': getattr(self, 'selected_text_color', NOTE_TEXT_COLOR),
+            'note_color': self.selected_color,
+            'note_text_color': self.selected_text_color,
             'note_text_size': self.text_size_spin.value(),
             'note_font_family': self.font_combo.currentText(),
             'hide_terminal': self.hide_terminal_cb.isChecked(),